@@ -4,13 +4,14 @@ import uuid
 
 def convert_to_wav(input_path: str) -> str:
     """
-    Converts any audio format to WAV (16kHz, mono, PCM)
+    Converts any audio format to WAV (16kHz, mono, 16-bit PCM)
     Returns the converted WAV path
     """
     audio = AudioSegment.from_file(input_path)
 
     audio = audio.set_channels(1)
     audio = audio.set_frame_rate(16000)
+    audio = audio.set_sample_width(2)
 
     output_path = f"temp_{uuid.uuid4().hex}.wav"
     audio.export(output_path, format="wav")
@@ -0,0 +1,131 @@
+import json
+import os
+import wave
+from abc import ABC, abstractmethod
+
+from audio.audio_utils import convert_to_wav
+from utils.tuning import get_setting
+
+SAMPLE_RATE = 16000
+CHUNK_FRAMES = 4000
+
+VOSK_MODEL_PATH = "vosk-model-en-us-0.22-lgraph"
+WHISPER_MODEL_NAME = "base.en"
+
+
+class ASRBackend(ABC):
+    """
+    Speech-to-text backend. Audio is streamed as 16 kHz mono 16-bit PCM
+    byte chunks; transcribe_file handles format conversion.
+    """
+    name = ""
+
+    @abstractmethod
+    def load(self):
+        """Load the model (idempotent). Called lazily by the transcribe methods."""
+
+    @abstractmethod
+    def transcribe_stream(self, chunks) -> str:
+        """Transcribe an iterable of PCM byte chunks"""
+
+    def transcribe_file(self, audio_path: str) -> str:
+        # ALWAYS convert to 16 kHz mono WAV first
+        wav_path = convert_to_wav(audio_path)
+        try:
+            with wave.open(wav_path, "rb") as wf:
+                return self.transcribe_stream(_read_chunks(wf))
+        finally:
+            try:
+                os.remove(wav_path)
+            except OSError:
+                pass
+
+    def transcribe_batch(self, audio_paths: list) -> list:
+        return [self.transcribe_file(path) for path in audio_paths]
+
+
+def _read_chunks(wf):
+    while True:
+        data = wf.readframes(CHUNK_FRAMES)
+        if len(data) == 0:
+            break
+        yield data
+
+
+class VoskBackend(ASRBackend):
+    name = "vosk"
+
+    def __init__(self, model_path: str = None):
+        self.model_path = model_path or get_setting("asr", "vosk_model_path", VOSK_MODEL_PATH)
+        self.model = None
+
+    def load(self):
+        if self.model is None:
+            from vosk import Model
+            if not os.path.exists(self.model_path):
+                raise RuntimeError(f"Vosk model not found at {self.model_path}")
+            self.model = Model(self.model_path)
+        return self.model
+
+    def transcribe_stream(self, chunks) -> str:
+        from vosk import KaldiRecognizer
+
+        rec = KaldiRecognizer(self.load(), SAMPLE_RATE)
+        rec.SetWords(True)
+
+        text = ""
+        for data in chunks:
+            if rec.AcceptWaveform(data):
+                result = json.loads(rec.Result())
+                text += result.get("text", "") + " "
+
+        final_result = json.loads(rec.FinalResult())
+        text += final_result.get("text", "")
+        return text.strip()
+
+
+class WhisperBackend(ASRBackend):
+    name = "whisper"
+
+    def __init__(self, model_name: str = None):
+        self.model_name = model_name or get_setting("asr", "whisper_model", WHISPER_MODEL_NAME)
+        self.model = None
+
+    def load(self):
+        if self.model is None:
+            import whisper
+            self.model = whisper.load_model(self.model_name, device="cpu")
+        return self.model
+
+    def transcribe_stream(self, chunks) -> str:
+        import numpy as np
+
+        # Whisper decodes 30 s windows over the whole signal, so collect it first
+        pcm = np.frombuffer(b"".join(chunks), dtype=np.int16)
+        if len(pcm) == 0:
+            return ""
+        audio = pcm.astype(np.float32) / 32768.0
+        result = self.load().transcribe(audio, language="en", fp16=False)
+        return result.get("text", "").strip()
+
+
+BACKENDS = {
+    VoskBackend.name: VoskBackend,
+    WhisperBackend.name: WhisperBackend,
+}
+
+_instances = {}
+
+
+def get_backend(name: str = None) -> ASRBackend:
+    """
+    The configured ASR backend: `name`, else the ASR_BACKEND environment
+    variable, else "backend" in the asr section of the tuning profile,
+    else Vosk. One instance per backend is kept per process.
+    """
+    name = name or os.environ.get("ASR_BACKEND") or get_setting("asr", "backend", VoskBackend.name)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ASR backend: {name} (choose from {', '.join(BACKENDS)})")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
@@ -1,4 +1,6 @@
+import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from utils.tuning import get_setting
 
 MODEL_NAME = "vennify/t5-base-grammar-correction"
 
@@ -8,15 +10,27 @@ _model = None
 def load_model():
     global _tokenizer, _model
     if _tokenizer is None or _model is None:
+        # Apply the tuned intra-op thread count before the first forward pass
+        threads = get_setting("corrector", "torch_threads")
+        if threads:
+            torch.set_num_threads(threads)
         _tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
         _model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
     return _tokenizer, _model
 
 
-def correct_grammar_ml(text: str) -> str:
+def correct_grammar_ml(text: str, decoding: str = None) -> str:
+    """
+    decoding: "beam" (num_beams=5, the default), "greedy", or "copy" for
+    greedy decoding that drafts from the input tokens (see _copy_draft_generate).
+    Defaults to the tuned profile's choice, else "beam".
+    """
     if not text.strip():
         return ""
 
+    if decoding is None:
+        decoding = get_setting("corrector", "decoding", "beam")
+
     tokenizer, model = load_model()
 
     input_text = f"grammar: {text}"
@@ -27,11 +41,163 @@ def correct_grammar_ml(text: str) -> str:
         truncation=True
     )
 
-    outputs = model.generate(
-        inputs,
-        max_length=256,
-        num_beams=5,
-        early_stopping=True
-    )
+    if decoding == "copy":
+        draft = tokenizer.encode(text, max_length=256, truncation=True)
+        output = _copy_draft_generate(model, inputs, draft, max_length=256)
+        return tokenizer.decode(output, skip_special_tokens=True)
+
+    if decoding == "greedy":
+        outputs = model.generate(inputs, max_length=256, num_beams=1, do_sample=False)
+    elif decoding == "beam":
+        outputs = model.generate(
+            inputs,
+            max_length=256,
+            num_beams=5,
+            early_stopping=True
+        )
+    else:
+        raise ValueError(f"Unknown decoding mode: {decoding}")
 
     return tokenizer.decode(outputs[0], skip_special_tokens=True)
+
+
+def _crop_cache(past, length: int):
+    """Drop self-attention cache entries past `length` decoder positions"""
+    if hasattr(past, "crop"):
+        # A negative argument removes that many tokens on every version
+        # that has Cache.crop; positive lengths are deprecated
+        excess = past.get_seq_length() - length
+        if excess > 0:
+            past.crop(-excess)
+        return past
+    # Legacy tuple cache: (self_k, self_v, cross_k, cross_v) per layer
+    return tuple(
+        (layer[0][:, :, :length], layer[1][:, :, :length]) + tuple(layer[2:])
+        for layer in past
+    )
+
+
+def _realign(draft: list, generated: list, expected: int,
+             max_ngram: int = 3, window: int = 8) -> int:
+    """
+    Find where the draft resumes after the output diverged from it.
+
+    Looks for the last 1-3 generated tokens in the draft (prompt-lookup
+    n-gram matching), longest n-gram first, taking the occurrence nearest
+    to `expected` within `window` tokens either side. Searching backwards
+    as well as forwards re-syncs after inserted tokens, not only deleted
+    ones. If nothing matches, assume a substitution; a wrong guess costs
+    one extra forward pass and the next call re-syncs.
+    """
+    for n in range(min(max_ngram, len(generated) - 1), 0, -1):
+        ngram = generated[-n:]
+        best = None
+        for end in range(max(n, expected - window), min(len(draft), expected + window) + 1):
+            if draft[end - n:end] == ngram and (best is None or abs(end - expected) < abs(best - expected)):
+                best = end
+        if best is not None:
+            return best
+    return expected
+
+
+@torch.no_grad()
+def _copy_draft_generate(model, input_ids, draft: list, max_length: int = 256,
+                         draft_len: int = 16) -> list:
+    """
+    Greedy decoding that uses the input tokens as the draft.
+
+    Each step feeds the next `draft_len` draft tokens through the decoder
+    in a single forward pass and keeps the longest prefix that matches the
+    model's own argmax, plus the model's token at the first mismatch. Every
+    kept token is therefore the greedy choice for its prefix, so the output
+    equals greedy generate() (up to floating-point ties), while unchanged
+    spans of the input cost one forward pass instead of one per token.
+    """
+    encoder_outputs = model.get_encoder()(input_ids=input_ids)
+    eos_id = model.config.eos_token_id
+
+    generated = [model.config.decoder_start_token_id]
+    past = None
+    pos = 0
+
+    while len(generated) < max_length:
+        proposal = draft[pos:pos + draft_len][:max_length - len(generated) - 1]
+
+        # The cache covers every generated token but the last one
+        feed = (generated if past is None else generated[-1:]) + proposal
+        out = model(
+            encoder_outputs=encoder_outputs,
+            decoder_input_ids=torch.tensor([feed], device=input_ids.device),
+            past_key_values=past,
+            use_cache=True
+        )
+        preds = out.logits[0, -(len(proposal) + 1):].argmax(-1).tolist()
+
+        accepted = 0
+        while accepted < len(proposal) and preds[accepted] == proposal[accepted]:
+            accepted += 1
+        new_tokens = proposal[:accepted] + [preds[accepted]]
+
+        past = _crop_cache(out.past_key_values, len(generated) + accepted)
+        generated.extend(new_tokens)
+
+        if eos_id in new_tokens:
+            return generated[:len(generated) - len(new_tokens) + new_tokens.index(eos_id) + 1]
+
+        if accepted == len(proposal) and pos + accepted < len(draft) \
+                and draft[pos + accepted] == preds[accepted]:
+            pos += accepted + 1  # bonus token continued the draft
+        else:
+            pos = _realign(draft, generated, pos + accepted + 1)
+
+    return generated
+
+
+def correct_grammar_batch(texts: list, batch_size: int = None, decoding: str = None) -> list:
+    """
+    Correct several texts, running `batch_size` of them per generate() call.
+    decoding is as for correct_grammar_ml; "copy" drafts from each input
+    separately, so it runs item by item and ignores batch_size.
+    """
+    if batch_size is None:
+        batch_size = get_setting("corrector", "batch_size", 1)
+    if decoding is None:
+        decoding = get_setting("corrector", "decoding", "beam")
+
+    if decoding == "copy":
+        return [correct_grammar_ml(text, decoding) for text in texts]
+    if decoding == "greedy":
+        generate_args = {"num_beams": 1, "do_sample": False}
+    elif decoding == "beam":
+        generate_args = {"num_beams": 5, "early_stopping": True}
+    else:
+        raise ValueError(f"Unknown decoding mode: {decoding}")
+
+    results = [""] * len(texts)
+    pending = [i for i, t in enumerate(texts) if t.strip()]
+    if not pending:
+        return results
+
+    tokenizer, model = load_model()
+
+    for start in range(0, len(pending), batch_size):
+        indices = pending[start:start + batch_size]
+        inputs = tokenizer(
+            [f"grammar: {texts[i]}" for i in indices],
+            return_tensors="pt",
+            max_length=256,
+            truncation=True,
+            padding=True
+        )
+
+        outputs = model.generate(
+            **inputs,
+            max_length=256,
+            **generate_args
+        )
+
+        decoded = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        for i, corrected in zip(indices, decoded):
+            results[i] = corrected
+
+    return results
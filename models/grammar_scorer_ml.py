@@ -9,3 +9,18 @@ def grammar_score_ml(original: str, corrected: str) -> int:
 
     # clamp
     return max(30, min(100, base_score))
+
+
+def grammar_score_report(original: str, corrected: str, similarity: float = None) -> dict:
+    """
+    Score plus the semantic-drift check. similarity is the cosine similarity
+    between original and corrected text (see models/semantic_drift.py); a low
+    value means the correction changed the meaning, not just the grammar.
+    """
+    from models.semantic_drift import DRIFT_THRESHOLD
+
+    report = {"score": grammar_score_ml(original, corrected)}
+    if similarity is not None:
+        report["similarity"] = round(similarity, 4)
+        report["meaning_changed"] = similarity < DRIFT_THRESHOLD
+    return report
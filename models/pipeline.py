@@ -0,0 +1,113 @@
+import gc
+import time
+
+
+def preload_models():
+    """
+    Load the ASR and grammar models in this process so forked workers can
+    share them copy-on-write instead of each loading their own copy.
+
+    Call this in the parent before forking and without running inference
+    first: torch's OpenMP thread pool does not survive fork().
+    """
+    import torch
+    from models.asr_backends import get_backend
+    from models.grammar_corrector_ml import load_model
+    from models.semantic_drift import load_model as load_embedding_model
+
+    _, model = load_model()
+    model.eval()
+    load_embedding_model()
+    get_backend().load()
+    torch.set_grad_enabled(False)
+
+    # Move everything loaded so far out of the cyclic GC's reach. Otherwise
+    # each child's collections write to these objects' headers and dirty
+    # (copy) the shared pages. Weight data lives in separate tensor storage
+    # that Python never writes to, so it stays shared.
+    gc.collect()
+    gc.freeze()
+
+
+def score_audio(audio_path: str) -> dict:
+    """
+    Run the full scoring pipeline (ASR -> grammar correction -> score)
+    on one audio file and return the result with per-stage timings
+    """
+    # Imported here so worker processes only pay for the models they use
+    from models.speech_to_text import transcribe
+    from models.grammar_corrector_ml import correct_grammar_ml
+    from models.grammar_scorer_ml import grammar_score_report
+    from models.semantic_drift import semantic_similarity
+
+    timings = {}
+
+    start = time.perf_counter()
+    text = transcribe(audio_path)
+    timings["transcribe"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    corrected = correct_grammar_ml(text)
+    timings["correct"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = grammar_score_report(text, corrected, semantic_similarity(text, corrected))
+    timings["score"] = time.perf_counter() - start
+
+    return {
+        "file": audio_path,
+        "transcript": text,
+        "corrected": corrected,
+        **report,
+        "timings": timings,
+    }
+
+
+def score_audio_batch(audio_paths: list, batch_size: int = None) -> list:
+    """
+    Score several files, batching the grammar correction step.
+    A file that fails to transcribe gets an "error" entry instead of a score.
+    """
+    from models.speech_to_text import transcribe
+    from models.grammar_corrector_ml import correct_grammar_batch
+    from models.grammar_scorer_ml import grammar_score_report
+    from models.semantic_drift import semantic_similarity_batch
+
+    results = []
+    for path in audio_paths:
+        start = time.perf_counter()
+        try:
+            text = transcribe(path)
+        except Exception as e:
+            results.append({"file": path, "error": str(e)})
+            continue
+        results.append({
+            "file": path,
+            "transcript": text,
+            "timings": {"transcribe": time.perf_counter() - start},
+        })
+
+    ok = [r for r in results if "error" not in r]
+    if not ok:
+        return results
+
+    start = time.perf_counter()
+    corrected = correct_grammar_batch([r["transcript"] for r in ok], batch_size)
+    # Batched correction time is shared evenly between the files in the batch
+    correct_time = (time.perf_counter() - start) / len(ok)
+
+    # One batched embedding call covers the drift check for every file
+    start = time.perf_counter()
+    similarities = semantic_similarity_batch(
+        [(r["transcript"], text) for r, text in zip(ok, corrected)]
+    )
+    similarity_time = (time.perf_counter() - start) / len(ok)
+
+    for result, text, similarity in zip(ok, corrected, similarities):
+        start = time.perf_counter()
+        result["corrected"] = text
+        result.update(grammar_score_report(result["transcript"], text, similarity))
+        result["timings"]["correct"] = correct_time
+        result["timings"]["score"] = time.perf_counter() - start + similarity_time
+
+    return results
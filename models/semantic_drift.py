@@ -0,0 +1,137 @@
+import difflib
+import hashlib
+import re
+
+import numpy as np
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Corrections below this cosine similarity are flagged as changing the meaning
+DRIFT_THRESHOLD = 0.85
+
+MAX_CACHE_SIZE = 100_000
+
+_model = None
+_cache = {}  # sha1 of sentence -> unit-length embedding
+
+
+def load_model():
+    global _model
+    if _model is None:
+        from sentence_transformers import SentenceTransformer
+        _model = SentenceTransformer(MODEL_NAME, device="cpu")
+    return _model
+
+
+def split_sentences(text: str) -> list:
+    sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", text)]
+    return [s for s in sentences if s]
+
+
+def _key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def embed(texts: list, batch_size: int = 64) -> np.ndarray:
+    """
+    Unit-length embeddings for texts, encoding only those not already
+    cached, all in one batched call
+    """
+    keys = [_key(t) for t in texts]
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in _cache and key not in missing:
+            missing[key] = text
+
+    if missing:
+        vectors = load_model().encode(
+            list(missing.values()),
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        if len(_cache) + len(missing) > MAX_CACHE_SIZE:
+            _cache.clear()
+        _cache.update(zip(missing.keys(), vectors.astype(np.float32)))
+
+    return np.stack([_cache[k] for k in keys])
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+def _sentence_pairs(original: str, corrected: str) -> list:
+    """
+    Split the corrected text into sentences and pair each with the span of
+    original words it was made from, found by word-level difflib alignment.
+    ASR transcripts have no punctuation, so the original cannot be split
+    into sentences on its own. Both sides are normalized, so casing and
+    punctuation fixes compare as identical and repeated sentences share
+    cache entries.
+    """
+    a = original.split()
+    a_norm = [normalize(w) for w in a]
+    j = 0
+    boundaries = []
+    for sentence in split_sentences(corrected):
+        words = sentence.split()
+        boundaries.append((j, j + len(words), sentence))
+        j += len(words)
+    b_norm = [normalize(w) for w in corrected.split()]
+
+    opcodes = difflib.SequenceMatcher(a=a_norm, b=b_norm, autojunk=False).get_opcodes()
+
+    def to_original(pos):
+        # Map a corrected word index to the matching original word index
+        for _, i1, i2, j1, j2 in opcodes:
+            if j1 <= pos < j2 or (j1 == j2 == pos):
+                if j2 == j1:
+                    return i1
+                return i1 + round((pos - j1) * (i2 - i1) / (j2 - j1))
+        return len(a)
+
+    pairs = []
+    for index, (start, end, sentence) in enumerate(boundaries):
+        span_start = 0 if index == 0 else to_original(start)
+        span_end = len(a) if index == len(boundaries) - 1 else to_original(end)
+        pairs.append((normalize(" ".join(a[span_start:span_end])), normalize(sentence)))
+    return pairs
+
+
+def semantic_similarity_batch(pairs: list) -> list:
+    """
+    Cosine similarity between each (original, corrected) pair. Texts are
+    compared sentence by sentence and the least similar sentence decides,
+    so one rewritten sentence in a long answer still shows up. A sentence
+    with nothing on the other side (added or dropped text) scores 0.
+    """
+    flat = []
+    for i, (original, corrected) in enumerate(pairs):
+        sentence_pairs = _sentence_pairs(original, corrected)
+        if not sentence_pairs:
+            # Empty correction: the whole original counts as dropped
+            sentence_pairs = [(normalize(original), "")]
+        for a, b in sentence_pairs:
+            flat.append((i, a, b))
+
+    result = np.ones(len(pairs), dtype=np.float32)
+
+    for i, a, b in flat:
+        if bool(a) != bool(b):
+            result[i] = 0.0
+
+    # Unchanged sentences (after normalizing) are identical; skip encoding them
+    changed = [(i, a, b) for i, a, b in flat if a != b and a and b]
+    if changed:
+        owners = np.array([i for i, _, _ in changed])
+        vectors = embed([a for _, a, _ in changed] + [b for _, _, b in changed])
+        left, right = vectors[:len(changed)], vectors[len(changed):]
+        np.minimum.at(result, owners, np.einsum("ij,ij->i", left, right))
+
+    return [float(s) for s in np.clip(result, -1.0, 1.0)]
+
+
+def semantic_similarity(original: str, corrected: str) -> float:
+    return semantic_similarity_batch([(original, corrected)])[0]
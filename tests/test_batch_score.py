@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+
+import pytest
+
+from tools.batch_score import run_local, shard
+from utils.work_queue import DONE, FAILED, RemoteQueue, WorkQueue, make_queue_server
+
+
+def _fake_score(paths):
+    if "bad.wav" in paths:
+        raise RuntimeError("cannot decode bad.wav")
+    time.sleep(0.1)
+    return [{"file": path, "score": 50, "worker_pid": os.getpid()} for path in paths]
+
+
+def _fill(queue, names):
+    queue.add_units(shard([{"file": name, "candidate": "C1"} for name in names], 2))
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return WorkQueue(str(tmp_path / "queue.db"), lease_seconds=5, max_attempts=2)
+
+
+def _scored(queue):
+    return [result for results in queue.results() for result in results]
+
+
+def test_local_workers_score_every_file_once(queue):
+    names = [f"f{i}.wav" for i in range(12)]
+    _fill(queue, names)
+
+    run_local(queue, workers=3, poll_interval=0.05, score_fn=_fake_score)
+
+    assert queue.counts()[DONE] == 6
+    scored = _scored(queue)
+    assert sorted(r["file"] for r in scored) == sorted(names)
+    assert all(r["candidate"] == "C1" and r["scored_at"] for r in scored)
+    assert len({r["worker_pid"] for r in scored}) > 1
+
+
+def test_failing_unit_does_not_stop_other_workers(queue):
+    _fill(queue, ["a.wav", "b.wav", "bad.wav", "c.wav"])
+
+    run_local(queue, workers=2, poll_interval=0.05, score_fn=_fake_score)
+
+    counts = queue.counts()
+    assert (counts[DONE], counts[FAILED]) == (1, 1)
+    assert sorted(r["file"] for r in _scored(queue)) == ["a.wav", "b.wav"]
+
+
+def test_remote_workers(queue):
+    names = [f"f{i}.wav" for i in range(8)]
+    _fill(queue, names)
+    server = make_queue_server(queue, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        remote = RemoteQueue(f"http://127.0.0.1:{server.server_address[1]}")
+        assert (remote.lease_seconds, remote.max_attempts) == (5, 2)
+
+        run_local(remote, workers=2, poll_interval=0.05, score_fn=_fake_score)
+
+        assert remote.is_finished()
+        assert remote.counts()[DONE] == 4
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert sorted(r["file"] for r in _scored(queue)) == sorted(names)
@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from models.grammar_corrector_ml import _copy_draft_generate, _realign  # noqa: E402
+
+MAX_LENGTH = 40
+
+
+def test_realign_after_substitution():
+    draft = [10, 11, 12, 13, 14]
+    # Model wrote 99 instead of 12: no n-gram match, resume after it
+    assert _realign(draft, [0, 10, 11, 99], expected=3) == 3
+
+
+def test_realign_after_deletion():
+    draft = [10, 11, 12, 13, 14, 15]
+    # Model skipped 12 and wrote 13; the draft resumes after 13
+    assert _realign(draft, [0, 10, 11, 13], expected=3) == 4
+
+
+def test_realign_after_insertion():
+    draft = [10, 11, 12, 13, 14, 15]
+    # Model inserted 99 before 12; the last generated n-gram is 99, which is
+    # not in the draft, so the guess stays put at 12 ...
+    assert _realign(draft, [0, 10, 11, 99], expected=3) == 3
+    # ... and once 12 is generated the draft re-syncs backwards to after 12,
+    # not two tokens ahead where the plain position would point
+    assert _realign(draft, [0, 10, 11, 99, 12], expected=4) == 3
+
+
+def test_realign_prefers_longest_then_nearest_match():
+    draft = [5, 6, 7, 1, 6, 7, 2, 6, 7]
+    # "6 7" occurs three times; the occurrence nearest `expected` wins
+    assert _realign(draft, [0, 6, 7], expected=7) == 6
+    # "1 6 7" only occurs once, and the trigram beats nearer bigrams
+    assert _realign(draft, [0, 1, 6, 7], expected=9) == 6
+
+
+@pytest.fixture(scope="module")
+def model():
+    config = transformers.T5Config(
+        vocab_size=64, d_model=32, d_ff=64, d_kv=16, num_layers=2, num_heads=2,
+        decoder_start_token_id=0, pad_token_id=0, eos_token_id=1
+    )
+    model = transformers.T5ForConditionalGeneration(config).eval()
+    # The default init is so flat that greedy decoding repeats the pad token;
+    # wider weights give varied outputs for the drafts to diverge from
+    torch.manual_seed(0)
+    with torch.no_grad():
+        for param in model.parameters():
+            param.normal_(0, 0.5)
+    return model
+
+
+def _greedy(model, input_ids):
+    return model.generate(input_ids, max_length=MAX_LENGTH, num_beams=1, do_sample=False)[0].tolist()
+
+
+def _perturb(tokens, rng):
+    tokens = list(tokens)
+    for _ in range(3):
+        i = rng.randrange(len(tokens) + 1)
+        edit = rng.choice(["insert", "delete", "replace"])
+        if edit == "insert":
+            tokens.insert(i, rng.randrange(2, 64))
+        elif i < len(tokens):
+            if edit == "delete":
+                del tokens[i]
+            else:
+                tokens[i] = rng.randrange(2, 64)
+    return tokens
+
+
+class CountingModel:
+    def __init__(self, model):
+        self.model = model
+        self.config = model.config
+        self.calls = 0
+
+    def get_encoder(self):
+        return self.model.get_encoder()
+
+    def __call__(self, **kwargs):
+        self.calls += 1
+        return self.model(**kwargs)
+
+
+def test_copy_decoding_matches_greedy(model):
+    rng = random.Random(0)
+    for _ in range(20):
+        source = [rng.randrange(2, 64) for _ in range(rng.randrange(5, 30))] + [1]
+        input_ids = torch.tensor([source])
+        greedy = _greedy(model, input_ids)
+        output = greedy[1:]  # without the decoder start token
+
+        drafts = [source, output, _perturb(output, rng)]
+        for draft in drafts:
+            assert _copy_draft_generate(model, input_ids, draft, max_length=MAX_LENGTH) == greedy
+
+
+def test_exact_draft_needs_one_pass_per_chunk(model):
+    input_ids = torch.tensor([[5, 6, 7, 8, 1]])
+    greedy = _greedy(model, input_ids)
+    assert len(greedy) == MAX_LENGTH  # no early EOS
+    counting = CountingModel(model)
+    assert _copy_draft_generate(counting, input_ids, greedy[1:], max_length=MAX_LENGTH,
+                                draft_len=16) == greedy
+    # 39 tokens in chunks of 16 accepted draft tokens plus one bonus token
+    assert counting.calls == 3
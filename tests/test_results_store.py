@@ -0,0 +1,134 @@
+import math
+import os
+
+import numpy as np
+import pytest
+
+from utils.results_store import ResultsStore, make_row
+
+
+def _result(file_id, score, total, scored_at, candidate="C1", similarity=None):
+    result = {
+        "file": file_id,
+        "candidate": candidate,
+        "transcript": "i goes to school",
+        "corrected": "I go to school.",
+        "score": score,
+        "timings": {"transcribe": total / 2, "correct": total / 2},
+        "scored_at": scored_at,
+    }
+    if similarity is not None:
+        result["similarity"] = similarity
+    return result
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultsStore(str(tmp_path / "store"), segment_rows=3)
+
+
+def _fill(store, count, candidate_of=lambda i: f"C{i % 2}"):
+    for i in range(count):
+        store.append_result(_result(
+            f"f{i}.wav", score=float(i), total=float(i % 5),
+            scored_at=f"2026-06-{i + 1:02d}T12:00:00", candidate=candidate_of(i)
+        ))
+    store.flush()
+
+
+def _count(store, **kwargs):
+    return sum(len(chunk["score"]) for chunk in store.scan(["score"], **kwargs))
+
+
+def test_make_row():
+    row = make_row(_result("a.wav", 80, 2.0, "2026-06-01T10:00:00", similarity=0.9))
+    assert row["file_id"] == "a.wav"
+    assert row["candidate"] == "C1"
+    assert row["time_total"] == 2.0
+    assert row["scored_at"] == "2026-06-01T10:00:00"
+    assert (row["words_original"], row["words_corrected"], row["words_replaced"]) == (4, 4, 3)
+    assert make_row(_result("a.wav", 80, 2.0, None), candidate="C9")["candidate"] == "C9"
+
+
+def test_append_writes_a_segment_every_segment_rows(store):
+    _fill(store, 2)
+    store.append_result({"error": "failed"})
+    store.append_result(_result("x.wav", 1, 1, "2026-06-10"))
+    assert len(store._segments()) == 1
+    store.append_result(_result("y.wav", 1, 1, "2026-06-11"))
+    store.flush()
+    assert len(store._segments()) == 2
+    assert _count(store) == 4
+
+
+def test_candidate_and_date_filters_span_segments(store):
+    _fill(store, 10)
+    assert len(store._segments()) == 4
+    assert store.candidates() == ["C0", "C1"]
+    assert _count(store, candidate="C0") == 5
+    # June 3rd up to (not including) June 8th: days 3-7
+    assert _count(store, start="2026-06-03", end="2026-06-08") == 5
+    files = [f for chunk in store.scan(["file_id"], candidate="C1", start="2026-06-03",
+                                       end="2026-06-08") for f in chunk["file_id"]]
+    assert sorted(files) == ["f3.wav", "f5.wav"]
+    assert _count(store, candidate="C9") == 0
+
+
+def test_cohort_stats(store):
+    _fill(store, 10)
+    stats = store.cohort_stats(candidate="C0")
+    assert stats["count"] == 5
+    assert stats["mean_score"] == pytest.approx(4.0)
+    assert stats["p50_score"] == pytest.approx(4.0)
+    assert store.cohort_stats(candidate="C9") == {"count": 0}
+
+
+def test_slowest_keeps_top_n_across_chunks(store):
+    _fill(store, 10)
+    slowest = store.slowest(3)
+    # time_total is i % 5, so 4, 4, then one of the 3s
+    assert [row["time_total"] for row in slowest] == [4.0, 4.0, 3.0]
+    assert {row["file_id"] for row in slowest[:2]} == {"f4.wav", "f9.wav"}
+    assert len(store.slowest(100)) == 10
+    assert store.slowest(0) == []
+
+
+def test_missing_similarity_is_stored_as_nan(store):
+    store.append_result(_result("a.wav", 1, 1, "2026-06-01"))
+    store.append_result(_result("b.wav", 1, 1, "2026-06-02", similarity=0.5))
+    store.flush()
+    (chunk,) = store.scan(["file_id", "similarity"])
+    values = dict(zip(chunk["file_id"].tolist(), chunk["similarity"].tolist()))
+    assert math.isnan(values["a.wav"])
+    assert values["b.wav"] == pytest.approx(0.5)
+
+
+def test_compaction_keeps_rows(store):
+    for i in range(7):
+        store.append_result(_result(f"f{i}.wav", float(i), 1, f"2026-06-{i + 1:02d}"))
+        store.flush()  # one-row segments, like the UI writes
+    before = store.cohort_stats()
+
+    store.compact()
+    # Merged into full segments; the replaced ones are still on disk but skipped
+    assert sorted(meta["rows"] for _, meta in store._segments()) == [1, 3, 3]
+    assert store.cohort_stats() == before
+
+    store.compact()
+    assert len(os.listdir(os.path.join(store.root, "segments"))) == 3
+    assert store.cohort_stats() == before
+
+
+def test_scan_survives_compaction_mid_scan(store):
+    for i in range(6):
+        store.append_result(_result(f"f{i}.wav", float(i), 1, f"2026-06-{i + 1:02d}"))
+        store.flush()
+
+    chunks = store.scan(["score"])
+    seen = [next(chunks)["score"]]
+    store.compact()
+    store.compact()  # deletes the segments the running scan listed
+    seen.extend(chunk["score"] for chunk in chunks)
+    # Rows in deleted segments are skipped rather than raising
+    assert len(np.concatenate(seen)) <= 6
+    assert _count(store) == 6
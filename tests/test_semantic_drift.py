@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from models import semantic_drift
+from models.semantic_drift import _sentence_pairs, semantic_similarity, semantic_similarity_batch
+
+
+class FakeEncoder:
+    """Bag-of-words embeddings, recording every text it is asked to encode"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), 256), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.split():
+                vectors[row, sum(map(ord, word)) % 256] += 1.0
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def encoder(monkeypatch):
+    encoder = FakeEncoder()
+    monkeypatch.setattr(semantic_drift, "_cache", {})
+    monkeypatch.setattr(semantic_drift, "load_model", lambda: encoder)
+    return encoder
+
+
+def test_sentences_are_aligned_to_transcript_spans():
+    pairs = _sentence_pairs(
+        "my name is john i are from delhi",
+        "My name is John. I am from Delhi."
+    )
+    assert pairs == [
+        ("my name is john", "my name is john"),
+        ("i are from delhi", "i am from delhi"),
+    ]
+
+
+def test_case_and_punctuation_fixes_are_not_encoded(encoder):
+    assert semantic_similarity("my name is john", "My name is John.") == 1.0
+    assert encoder.encoded == []
+
+
+def test_added_sentence_scores_zero(encoder):
+    original = "i goes to school"
+    corrected = "I go to school. Also I love my dog very much."
+    assert _sentence_pairs(original, corrected)[-1] == ("", "also i love my dog very much")
+    assert semantic_similarity(original, corrected) == 0.0
+
+
+def test_empty_correction_scores_zero(encoder):
+    assert semantic_similarity("i goes to school every day", "") == 0.0
+    assert semantic_similarity("", "") == 1.0
+
+
+def test_least_similar_sentence_decides(encoder):
+    scores = semantic_similarity_batch([
+        ("i goes to school", "I go to school."),
+        ("i goes to school i like cats", "I go to school. I hate dogs."),
+    ])
+    assert 0.0 < scores[1] < scores[0] < 1.0
+
+
+def test_repeated_sentences_hit_the_cache(encoder):
+    semantic_similarity_batch([("she go home", "She goes home.")] * 3)
+    semantic_similarity("she go home", "She goes home.")
+    assert sorted(encoder.encoded) == ["she go home", "she goes home"]
@@ -0,0 +1,25 @@
+from utils.text_compare import edit_stats, word_errors
+
+
+def test_word_errors_ignores_case_and_punctuation():
+    assert word_errors("Hello, world!", "hello world") == (0, 2)
+
+
+def test_word_errors_counts_each_edit_kind():
+    reference = "the cat sat on the mat"
+    assert word_errors(reference, "the cat sat on a mat") == (1, 6)
+    assert word_errors(reference, "the cat sat on the big mat") == (1, 6)
+    assert word_errors(reference, "the cat on the mat") == (1, 6)
+    assert word_errors(reference, "a dog sat on mat") == (3, 6)
+
+
+def test_word_errors_with_empty_sides():
+    assert word_errors("", "") == (0, 0)
+    assert word_errors("one two", "") == (2, 2)
+    assert word_errors("", "one two") == (2, 0)
+
+
+def test_edit_stats():
+    assert edit_stats("i goes to school", "I go to the school") == {
+        "original": 4, "corrected": 5, "inserted": 1, "deleted": 0, "replaced": 2,
+    }
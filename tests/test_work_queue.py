@@ -0,0 +1,97 @@
+import pytest
+
+from utils import work_queue
+from utils.work_queue import DONE, FAILED, LEASED, PENDING, WorkQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(work_queue.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    q = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=10, max_attempts=2)
+    q.add_units([["a.wav"], ["b.wav"]])
+    return q
+
+
+def test_claim_leases_units_in_order(queue):
+    assert queue.claim("w1") == (1, ["a.wav"])
+    assert queue.claim("w2") == (2, ["b.wav"])
+    assert queue.claim("w3") is None
+    assert queue.counts()[LEASED] == 2
+
+
+def test_heartbeat_keeps_lease_alive(queue, clock):
+    unit_id, _ = queue.claim("w1")
+    clock.now += 8
+    assert queue.heartbeat(unit_id, "w1")
+    clock.now += 8
+    # Renewed lease has not expired, so the unit is not handed out again
+    assert queue.claim("w2") == (2, ["b.wav"])
+    assert queue.claim("w2") is None
+
+
+def test_expired_lease_is_reclaimed_and_stale_worker_rejected(queue, clock):
+    unit_id, _ = queue.claim("w1")
+    clock.now += 11
+
+    assert queue.claim("w2") == (unit_id, ["a.wav"])
+    assert not queue.heartbeat(unit_id, "w1")
+    assert not queue.complete(unit_id, "w1", ["stale"])
+
+    assert queue.complete(unit_id, "w2", ["fresh"])
+    assert list(queue.results()) == [["fresh"]]
+
+
+def test_lost_leases_fail_after_max_attempts(queue, clock):
+    unit_id, _ = queue.claim("w1")
+    clock.now += 11
+    assert queue.claim("w2")[0] == unit_id
+    clock.now += 11
+
+    # Second attempt expired too; the unit fails instead of being retried
+    assert queue.claim("w3") == (2, ["b.wav"])
+    assert queue.counts()[FAILED] == 1
+
+
+def test_fail_requeues_until_max_attempts(queue):
+    unit_id, _ = queue.claim("w1")
+    assert queue.fail(unit_id, "w1", "boom")
+    assert queue.counts()[PENDING] == 2
+
+    assert queue.claim("w1")[0] == unit_id
+    assert queue.fail(unit_id, "w1", "boom again")
+    counts = queue.counts()
+    assert counts[FAILED] == 1
+    assert counts[PENDING] == 1
+
+
+def test_is_finished(queue):
+    assert not queue.is_finished()
+    for worker in ("w1", "w2"):
+        unit_id, _ = queue.claim(worker)
+        queue.complete(unit_id, worker, [])
+    assert queue.counts()[DONE] == 2
+    assert queue.is_finished()
+
+
+def test_results_are_ingested_once(queue):
+    unit_id, _ = queue.claim("w1")
+    queue.complete(unit_id, "w1", ["result"])
+
+    assert list(queue.results_to_ingest()) == [(unit_id, ["result"])]
+    queue.mark_ingested([unit_id])
+    assert list(queue.results_to_ingest()) == []
+    assert list(queue.results()) == [["result"]]
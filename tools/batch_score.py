@@ -0,0 +1,301 @@
+"""
+Sharded batch scoring over a shared work queue.
+
+    python -m tools.batch_score enqueue manifest.txt --queue scoring.db
+    python -m tools.batch_score serve --queue scoring.db --port 8765
+    python -m tools.batch_score worker --queue http://queue-host:8765   # on any node
+    python -m tools.batch_score worker --queue scoring.db               # on the queue host
+    python -m tools.batch_score status --queue scoring.db
+    python -m tools.batch_score export --queue scoring.db --output results.jsonl
+
+The queue database is only opened on the queue host. `serve` exposes it
+over XML-RPC so workers on other nodes can pass its URL as --queue;
+leases are then timed by the queue host's clock alone.
+
+`local` enqueues a manifest and runs several worker processes on this
+machine. By default they are forked from a parent that has already loaded
+the models, so the weights are shared; --no-preload gives each worker its
+own copy, like separate nodes. --memory-report prints RSS/PSS per worker.
+
+A manifest has one audio path per line, optionally followed by a tab and
+a candidate id. Blank lines and lines starting with '#' are ignored.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime
+
+from utils.memory import format_report, read_memory
+from utils.tuning import get_setting
+from utils.work_queue import RemoteQueue, WorkQueue, open_queue, serve_queue
+
+DEFAULT_QUEUE = "scoring_queue.db"
+
+
+def read_manifest(path: str) -> list:
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            parts = line.split("\t")
+            items.append({
+                "file": parts[0].strip(),
+                "candidate": parts[1].strip() if len(parts) > 1 else "",
+            })
+    return items
+
+
+def shard(items: list, shard_size: int) -> list:
+    return [items[i:i + shard_size] for i in range(0, len(items), shard_size)]
+
+
+def enqueue(manifest_path: str, queue: WorkQueue, shard_size: int) -> int:
+    items = read_manifest(manifest_path)
+    return queue.add_units(shard(items, shard_size))
+
+
+class _Heartbeat(threading.Thread):
+    """Renews a unit's lease in the background while the worker scores it"""
+
+    def __init__(self, queue, unit_id, worker_id, interval):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.unit_id = unit_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.lost = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            if not self.queue.heartbeat(self.unit_id, self.worker_id):
+                self.lost = True
+                return
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def score_unit(items: list, score_fn) -> list:
+    results = score_fn([item["file"] for item in items])
+    scored_at = datetime.now().isoformat(timespec="seconds")
+    for item, result in zip(items, results):
+        result["candidate"] = item.get("candidate", "")
+        result["scored_at"] = scored_at
+    return results
+
+
+def run_worker(queue, worker_id: str = None, poll_interval: float = 2.0, score_fn=None):
+    """
+    Claim and score units from a WorkQueue or RemoteQueue until it has
+    nothing left to do
+    """
+    if worker_id is None:
+        worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    if score_fn is None:
+        from models.pipeline import score_audio_batch
+        score_fn = score_audio_batch
+
+    heartbeat_interval = max(queue.lease_seconds / 3, 0.1)
+    processed = 0
+
+    while True:
+        claimed = queue.claim(worker_id)
+        if claimed is None:
+            if queue.is_finished():
+                break
+            # Other workers still hold leases; wait in case one is lost
+            time.sleep(poll_interval)
+            continue
+
+        unit_id, items = claimed
+        heartbeat = _Heartbeat(queue, unit_id, worker_id, heartbeat_interval)
+        heartbeat.start()
+        try:
+            results = score_unit(items, score_fn)
+        except Exception:
+            heartbeat.stop()
+            queue.fail(unit_id, worker_id, traceback.format_exc())
+            continue
+        heartbeat.stop()
+
+        if heartbeat.lost:
+            # Lease was reassigned; another worker owns this unit now
+            print(f"[{worker_id}] lost lease on unit {unit_id}, discarding")
+            continue
+        if queue.complete(unit_id, worker_id, results):
+            processed += 1
+
+    print(f"[{worker_id}] finished, {processed} unit(s) completed")
+    return processed
+
+
+def _worker_process(location, lease_seconds, max_attempts, node_index, poll_interval, score_fn):
+    queue = open_queue(location, lease_seconds, max_attempts)
+    run_worker(queue, f"{socket.gethostname()}-node{node_index}-{os.getpid()}",
+               poll_interval, score_fn)
+
+
+def run_local(queue, workers: int, preload: bool = False, memory_report: bool = False,
+              poll_interval: float = 2.0, score_fn=None):
+    """
+    Run `workers` worker processes on this machine against a WorkQueue or
+    RemoteQueue. score_fn defaults to the pipeline (see run_worker) and
+    must be picklable where processes are spawned.
+
+    Without preload each process loads its own models, like a separate node.
+    With preload (where fork is available) the models are loaded once here
+    and the workers are forked from this process, sharing the weights
+    read-only.
+    """
+    if preload and "fork" not in multiprocessing.get_all_start_methods():
+        # e.g. Windows: children are spawned and would not inherit the models
+        print("Warning: fork is not available on this platform; "
+              "each worker will load its own models")
+        preload = False
+
+    if preload:
+        from models.pipeline import preload_models
+        preload_models()
+        ctx = multiprocessing.get_context("fork")
+    else:
+        ctx = multiprocessing.get_context()
+
+    location = queue.url if isinstance(queue, RemoteQueue) else queue.db_path
+    procs = []
+    for i in range(workers):
+        p = ctx.Process(
+            target=_worker_process,
+            args=(location, queue.lease_seconds, queue.max_attempts, i, poll_interval, score_fn)
+        )
+        p.start()
+        procs.append(p)
+
+    peak = {}
+    while any(p.is_alive() for p in procs):
+        if memory_report:
+            _sample_memory(procs, peak)
+        time.sleep(1.0)
+    for p in procs:
+        p.join()
+
+    if memory_report:
+        print(format_report(peak))
+
+
+def _sample_memory(procs, peak):
+    """Keep the highest PSS sample seen for each process"""
+    samples = {"coordinator": os.getpid()}
+    samples.update({f"worker-{i}": p.pid for i, p in enumerate(procs) if p.is_alive()})
+    for name, pid in samples.items():
+        try:
+            usage = read_memory(pid)
+        except OSError:
+            continue  # exited between the liveness check and the read
+        if usage.get("Pss", 0) >= peak.get(name, {}).get("Pss", 0):
+            peak[name] = usage
+
+
+def export(queue: WorkQueue, output_path: str, store_root: str = None) -> int:
+    """
+    Write all completed results as JSON lines. With store_root, also append
+    the units not ingested by an earlier export to that results store.
+    """
+    count = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        for results in queue.results():
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+                count += 1
+
+    if store_root:
+        ingest(queue, store_root)
+    return count
+
+
+def ingest(queue: WorkQueue, store_root: str) -> int:
+    """Append results of units not yet ingested to the store, then mark them"""
+    from utils.results_store import ResultsStore
+
+    unit_ids = []
+    rows = 0
+    with ResultsStore(store_root) as store:
+        for unit_id, results in queue.results_to_ingest():
+            for result in results:
+                store.append_result(result)
+                rows += 1
+            unit_ids.append(unit_id)
+    # Marked only after the store has flushed, so a crash re-ingests
+    # rather than loses units
+    queue.mark_ingested(unit_ids)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed batch grammar scoring")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE,
+                        help="queue database path, or the http:// URL of a `serve` process")
+    parser.add_argument("--lease", type=float, default=120.0, help="lease length in seconds")
+    parser.add_argument("--max-attempts", type=int, default=3)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("enqueue", help="shard a manifest into work units")
+    p.add_argument("manifest")
+    p.add_argument("--shard-size", type=int, default=8)
+
+    p = sub.add_parser("serve", help="serve the queue database to workers on other nodes")
+    p.add_argument("--host", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=8765)
+
+    sub.add_parser("worker", help="claim and score units until the queue is drained")
+
+    p = sub.add_parser("local", help="enqueue a manifest and run several local workers")
+    p.add_argument("manifest")
+    p.add_argument("--shard-size", type=int, default=8)
+    p.add_argument("--workers", type=int,
+                   default=get_setting("pipeline", "workers", os.cpu_count() or 1),
+                   help="defaults to the tuned profile, else one per CPU")
+    p.add_argument("--preload", action=argparse.BooleanOptionalAction, default=True,
+                   help="load models once and fork workers that share them")
+    p.add_argument("--memory-report", action="store_true",
+                   help="print peak RSS/PSS per worker (Linux)")
+
+    sub.add_parser("status", help="show unit counts by status")
+
+    p = sub.add_parser("export", help="write completed results as JSON lines")
+    p.add_argument("--output", default="results.jsonl")
+    p.add_argument("--store", default=None,
+                   help="also append the results to this results store directory")
+
+    args = parser.parse_args(argv)
+    if args.queue.startswith(("http://", "https://")) and args.command not in ("worker", "status"):
+        parser.error(f"{args.command} needs the queue database; run it on the queue host")
+    queue = open_queue(args.queue, args.lease, args.max_attempts)
+
+    if args.command == "enqueue":
+        print(f"Enqueued {enqueue(args.manifest, queue, args.shard_size)} unit(s)")
+    elif args.command == "serve":
+        print(f"Serving {args.queue} on {args.host}:{args.port}")
+        serve_queue(queue, args.host, args.port)
+    elif args.command == "worker":
+        run_worker(queue)
+    elif args.command == "local":
+        print(f"Enqueued {enqueue(args.manifest, queue, args.shard_size)} unit(s)")
+        run_local(queue, args.workers, args.preload, args.memory_report)
+        print(queue.counts())
+    elif args.command == "status":
+        print(queue.counts())
+    elif args.command == "export":
+        print(f"Wrote {export(queue, args.output, args.store)} result(s) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark ASR backends: real-time factor, memory and word error rate.
+
+    python -m tools.bench_asr references.tsv
+    python -m tools.bench_asr references.tsv --backends vosk whisper --max-wer 0.15
+
+references.tsv has one audio path per line, a tab, then the reference
+transcript. Each backend runs in a fresh process so memory numbers are
+not mixed up. RTF is processing time / audio duration (lower is faster;
+below 1 is faster than real time).
+"""
+import argparse
+import multiprocessing
+import time
+
+from models.asr_backends import BACKENDS
+from utils.text_compare import word_errors
+
+
+def read_references(path: str) -> list:
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            audio_path, reference = line.split("\t", 1)
+            items.append((audio_path.strip(), reference.strip()))
+    return items
+
+
+def audio_duration(path: str) -> float:
+    from pydub import AudioSegment
+    return AudioSegment.from_file(path).duration_seconds
+
+
+def _bench_backend(name: str, items: list) -> dict:
+    """Runs in a child process"""
+    from models.asr_backends import get_backend
+    from utils.memory import current_rss_kb, peak_rss_kb
+
+    backend = get_backend(name)
+
+    start = time.perf_counter()
+    backend.load()
+    load_time = time.perf_counter() - start
+    rss_loaded = current_rss_kb()
+
+    start = time.perf_counter()
+    hypotheses = backend.transcribe_batch([path for path, _ in items])
+    process_time = time.perf_counter() - start
+
+    errors = words = 0
+    for (_, reference), hypothesis in zip(items, hypotheses):
+        e, w = word_errors(reference, hypothesis)
+        errors += e
+        words += w
+
+    return {
+        "backend": name,
+        "load_s": load_time,
+        "process_s": process_time,
+        "wer": errors / max(words, 1),
+        "rss_loaded_mb": _mb(rss_loaded),
+        "peak_rss_mb": _mb(peak_rss_kb()),
+    }
+
+
+def _mb(kb):
+    return None if kb is None else kb / 1024
+
+
+def _fmt_mb(value) -> str:
+    return "n/a" if value is None else f"{value:.0f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ASR backends")
+    parser.add_argument("references", help="TSV of audio path and reference transcript")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--max-wer", type=float, default=None,
+                        help="recommend the fastest backend with WER at or below this")
+    args = parser.parse_args(argv)
+
+    items = read_references(args.references)
+    total_audio = sum(audio_duration(path) for path, _ in items)
+    print(f"{len(items)} file(s), {total_audio:.1f} s of audio\n")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for name in args.backends:
+        with ctx.Pool(1) as pool:
+            result = pool.apply(_bench_backend, (name, items))
+        result["rtf"] = result["process_s"] / max(total_audio, 1e-9)
+        results.append(result)
+
+    print(f"{'backend':<10}{'RTF':>8}{'WER':>8}{'load s':>9}{'RSS MB':>9}{'peak MB':>9}")
+    for r in results:
+        print(
+            f"{r['backend']:<10}{r['rtf']:>8.3f}{r['wer']:>8.3f}{r['load_s']:>9.1f}"
+            f"{_fmt_mb(r['rss_loaded_mb']):>9}{_fmt_mb(r['peak_rss_mb']):>9}"
+        )
+
+    if args.max_wer is not None:
+        ok = [r for r in results if r["wer"] <= args.max_wer]
+        if ok:
+            best = min(ok, key=lambda r: r["rtf"])
+            print(f"\nCheapest backend within WER {args.max_wer}: {best['backend']}")
+            print(f"Select it with ASR_BACKEND={best['backend']} or "
+                  f"\"backend\": \"{best['backend']}\" in the asr section of tuning_profile.json")
+        else:
+            print(f"\nNo backend reached WER {args.max_wer}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare grammar correction decoding modes on a reference corpus.
+
+    python -m tools.bench_corrector
+    python -m tools.bench_corrector --corpus my_sentences.txt
+
+Reports total time and speedup of "greedy" and "copy" decoding against the
+default num_beams=5 path, and checks that "copy" reproduces greedy output.
+"""
+import argparse
+import time
+
+from models.grammar_corrector_ml import correct_grammar_ml, load_model
+from tools.tune import DEFAULT_TEXTS, percentile
+
+MODES = ["beam", "greedy", "copy"]
+
+
+def run_mode(texts: list, mode: str):
+    outputs = []
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        outputs.append(correct_grammar_ml(text, decoding=mode))
+        latencies.append(time.perf_counter() - start)
+    return outputs, latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark grammar correction decoding modes")
+    parser.add_argument("--corpus", default=DEFAULT_TEXTS, help="sentences, one per line")
+    args = parser.parse_args(argv)
+
+    with open(args.corpus, encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+
+    load_model()
+    correct_grammar_ml(texts[0], decoding="beam")  # warm up
+
+    outputs = {}
+    totals = {}
+    print(f"{'mode':<8}{'total s':>10}{'mean s':>10}{'p95 s':>10}{'speedup':>10}")
+    for mode in MODES:
+        outputs[mode], latencies = run_mode(texts, mode)
+        totals[mode] = sum(latencies)
+        print(
+            f"{mode:<8}{totals[mode]:>10.2f}{totals[mode] / len(texts):>10.3f}"
+            f"{percentile(latencies, 95):>10.3f}{totals['beam'] / totals[mode]:>9.2f}x"
+        )
+
+    matches = sum(a == b for a, b in zip(outputs["copy"], outputs["greedy"]))
+    print(f"\ncopy == greedy on {matches}/{len(texts)} sentences")
+    beam_matches = sum(a == b for a, b in zip(outputs["copy"], outputs["beam"]))
+    print(f"copy == beam   on {beam_matches}/{len(texts)} sentences")
+
+    for text, a, b in zip(texts, outputs["copy"], outputs["greedy"]):
+        if a != b:
+            print(f"\nMISMATCH: {text}\n  greedy: {b}\n  copy:   {a}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Query the results store.
+
+    python -m tools.query_results cohort --candidate C123 --start 2026-06-01 --end 2026-07-01
+    python -m tools.query_results slowest -n 20
+    python -m tools.query_results candidates
+    python -m tools.query_results compact
+"""
+import argparse
+import json
+
+from utils.results_store import DEFAULT_ROOT, ResultsStore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query scored results")
+    parser.add_argument("--store", default=DEFAULT_ROOT, help="results store directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in [("cohort", "score mean and percentiles"),
+                            ("slowest", "files with the longest pipeline time")]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--candidate", default=None)
+        p.add_argument("--start", default=None, help="inclusive, ISO date or datetime")
+        p.add_argument("--end", default=None, help="exclusive, ISO date or datetime")
+        if name == "slowest":
+            p.add_argument("-n", type=int, default=10)
+
+    sub.add_parser("candidates", help="list candidate ids")
+    sub.add_parser("compact", help="merge small segments")
+
+    args = parser.parse_args(argv)
+    store = ResultsStore(args.store)
+
+    if args.command == "cohort":
+        print(json.dumps(store.cohort_stats(args.candidate, args.start, args.end), indent=2))
+    elif args.command == "slowest":
+        for row in store.slowest(args.n, args.candidate, args.start, args.end):
+            print(json.dumps(row))
+    elif args.command == "candidates":
+        print("\n".join(store.candidates()))
+    elif args.command == "compact":
+        store.compact()
+
+
+if __name__ == "__main__":
+    main()
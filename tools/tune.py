@@ -0,0 +1,205 @@
+"""
+Sweep worker process counts, torch intra-op threads and batch sizes on
+this machine and write the best config to the tuning profile, which the
+pipeline loads automatically (see utils/tuning.py).
+
+    python -m tools.tune --audio samples/*.wav
+    python -m tools.tune --skip-asr --processes 1 2 4 --threads 1 2 4 --batch-sizes 1 4 8
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import platform
+import time
+from datetime import datetime
+
+from utils.tuning import PROFILE_PATH, load_profile, save_profile
+
+DEFAULT_TEXTS = os.path.join(os.path.dirname(__file__), "data", "reference_sentences.txt")
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _powers_of_two(limit: int) -> list:
+    values = []
+    n = 1
+    while n <= limit:
+        values.append(n)
+        n *= 2
+    return values
+
+
+def _init_corrector(threads):
+    import torch
+    from models.grammar_corrector_ml import load_model
+    load_model()
+    # Override whatever an existing profile set
+    torch.set_num_threads(threads)
+
+
+def _run_corrector(texts):
+    from models.grammar_corrector_ml import correct_grammar_batch
+    start = time.perf_counter()
+    correct_grammar_batch(texts, len(texts))
+    return len(texts), time.perf_counter() - start
+
+
+def _init_asr():
+    import torch
+    from models.asr_backends import get_backend
+    torch.set_num_threads(1)
+    get_backend().load()
+
+
+def _run_asr(path):
+    from models.speech_to_text import transcribe
+    start = time.perf_counter()
+    transcribe(path)
+    return 1, time.perf_counter() - start
+
+
+def _measure(processes, initializer, initargs, run, tasks, warmup_task):
+    """
+    Run `tasks` on a pool and return (items per second, p95 latency).
+    Every item in a task shares the task's latency, since a batched item
+    is not ready until its whole batch is.
+    """
+    with multiprocessing.Pool(processes, initializer, initargs) as pool:
+        pool.map(run, [warmup_task] * processes)
+
+        latencies = []
+        items = 0
+        start = time.perf_counter()
+        for count, latency in pool.imap_unordered(run, tasks):
+            items += count
+            latencies.extend([latency] * count)
+        wall = time.perf_counter() - start
+
+    return items / wall, percentile(latencies, 95)
+
+
+def _pick(measurements, max_p95):
+    candidates = [m for m in measurements if max_p95 is None or m["p95_latency"] <= max_p95]
+    if not candidates:
+        # Nothing meets the latency target; fall back to the lowest latency
+        return min(measurements, key=lambda m: m["p95_latency"])
+    return max(candidates, key=lambda m: m["throughput"])
+
+
+def tune_corrector(texts, process_counts, thread_counts, batch_sizes, rounds, max_p95):
+    cpus = os.cpu_count() or 1
+    measurements = []
+    for processes in process_counts:
+        for threads in thread_counts:
+            if processes * threads > cpus:
+                continue  # oversubscribed, torch threads would fight each other
+            for batch_size in batch_sizes:
+                workload = texts * rounds
+                tasks = [workload[i:i + batch_size] for i in range(0, len(workload), batch_size)]
+                throughput, p95 = _measure(
+                    processes, _init_corrector, (threads,), _run_corrector,
+                    tasks, texts[:batch_size]
+                )
+                m = {
+                    "processes": processes,
+                    "torch_threads": threads,
+                    "batch_size": batch_size,
+                    "throughput": round(throughput, 3),
+                    "p95_latency": round(p95, 3),
+                }
+                print(f"corrector {m}")
+                measurements.append(m)
+    return _pick(measurements, max_p95), measurements
+
+
+def tune_asr(audio_paths, process_counts, rounds, max_p95):
+    from models.asr_backends import get_backend
+    backend = get_backend().name
+    measurements = []
+    for processes in process_counts:
+        throughput, p95 = _measure(
+            processes, _init_asr, (), _run_asr,
+            audio_paths * rounds, audio_paths[0]
+        )
+        m = {
+            "backend": backend,
+            "processes": processes,
+            "throughput": round(throughput, 3),
+            "p95_latency": round(p95, 3),
+        }
+        print(f"asr {m}")
+        measurements.append(m)
+    return _pick(measurements, max_p95), measurements
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+
+    parser = argparse.ArgumentParser(description="Auto-tune CPU inference settings")
+    parser.add_argument("--audio", nargs="*", default=[], help="sample audio files for the ASR sweep")
+    parser.add_argument("--texts", default=DEFAULT_TEXTS, help="sample sentences, one per line")
+    parser.add_argument("--processes", type=int, nargs="+", default=_powers_of_two(cpus))
+    parser.add_argument("--threads", type=int, nargs="+", default=_powers_of_two(cpus))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--rounds", type=int, default=2, help="passes over the samples per config")
+    parser.add_argument("--max-p95", type=float, default=None,
+                        help="p95 latency budget in seconds; fastest config within it wins")
+    parser.add_argument("--skip-asr", action="store_true")
+    parser.add_argument("--output", default=PROFILE_PATH)
+    args = parser.parse_args(argv)
+
+    if not any(p * t <= cpus for p in args.processes for t in args.threads):
+        parser.error(
+            f"every --processes x --threads combination needs more than the {cpus} "
+            "CPUs available; lower one of them"
+        )
+
+    with open(args.texts, encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+
+    corrector, corrector_runs = tune_corrector(
+        texts, args.processes, args.threads, args.batch_sizes, args.rounds, args.max_p95
+    )
+
+    profile = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"cpus": cpus, "platform": platform.platform()},
+        "corrector": corrector,
+        "measurements": {"corrector": corrector_runs},
+    }
+
+    if args.audio and not args.skip_asr:
+        asr, asr_runs = tune_asr(args.audio, args.processes, args.rounds, args.max_p95)
+        # Merge so model settings read by the backends (vosk_model_path,
+        # whisper_model) survive re-tuning
+        profile["asr"] = {**load_profile().get("asr", {}), **asr}
+        profile["measurements"]["asr"] = asr_runs
+    elif "asr" in load_profile():
+        # Keep the existing ASR settings (e.g. the chosen backend)
+        profile["asr"] = load_profile()["asr"]
+
+    # Every pipeline worker runs both ASR and correction, so use the smaller
+    # of the two stages' best process counts to avoid oversubscribing either
+    workers = corrector["processes"]
+    if "processes" in profile.get("asr", {}):
+        workers = min(workers, profile["asr"]["processes"])
+    profile["pipeline"] = {"workers": workers}
+
+    save_profile(profile, args.output)
+    print(f"Recommended corrector: {corrector}")
+    if "asr" in profile:
+        print(f"Recommended ASR: {profile['asr']}")
+    print(f"Pipeline workers: {workers}")
+    print(f"Profile written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,8 @@ from datetime import datetime
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import warnings
-from models.speech_to_text import transcribe
-from models.grammar_corrector_ml import correct_grammar_ml
-from models.grammar_scorer_ml import grammar_score_ml
+from models.pipeline import score_audio
+from utils.results_store import ResultsStore
 
 # Suppress matplotlib warnings
 warnings.filterwarnings("ignore")
@@ -207,12 +206,17 @@ def process_grammar_and_show_score(audio_path, output, score_frame, status_label
         ))
         
         # Transcribe and process
-        text = transcribe(audio_path)
-        corrected = correct_grammar_ml(text)
-        score = grammar_score_ml(text, corrected)
+        result = score_audio(audio_path)
+        text = result["transcript"]
+        corrected = result["corrected"]
+        score = result["score"]
+        
+        # Keep a history of scored items for later queries
+        _save_result(result)
         
         # Update text output on main thread
-        app.after(0, _update_output, output, text, corrected, score)
+        app.after(0, _update_output, output, text, corrected, score,
+                  result.get("similarity"), result.get("meaning_changed"))
         
         # Update score visualization on main thread
         app.after(0, _create_score_plot, score_frame, score)
@@ -229,7 +233,15 @@ def process_grammar_and_show_score(audio_path, output, score_frame, status_label
                 text_color="red"
             ))
 
-def _update_output(output, text, corrected, score):
+def _save_result(result):
+    """Append scored item to the results store"""
+    try:
+        with ResultsStore() as store:
+            store.append_result(result)
+    except Exception as e:
+        print(f"Error saving result: {e}")
+
+def _update_output(output, text, corrected, score, similarity=None, meaning_changed=False):
     """Update output text widget"""
     if not app_running:
         return
@@ -239,6 +251,10 @@ def _update_output(output, text, corrected, score):
     output.insert("end", f"Original Text:\n{text}\n\n")
     output.insert("end", f"Corrected Text:\n{corrected}\n\n")
     output.insert("end", f"Grammar Score: {score}/100")
+    if similarity is not None:
+        output.insert("end", f"\n\nMeaning Similarity: {similarity:.2f}")
+        if meaning_changed:
+            output.insert("end", "\n⚠ Correction may have changed the meaning - please review")
     output.configure(state="disabled")
 
 class PieChartAnimation:
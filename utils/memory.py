@@ -0,0 +1,70 @@
+import os
+import sys
+
+FIELDS = ["Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty"]
+
+
+def read_memory(pid: int) -> dict:
+    """
+    Memory use of a process in kB, read from /proc/<pid>/smaps_rollup (Linux).
+    Pss splits shared pages between the processes mapping them, so summing
+    Pss over workers gives their real combined footprint.
+    """
+    usage = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            name = parts[0].rstrip(":")
+            if name in FIELDS:
+                usage[name] = int(parts[1])
+    return usage
+
+
+def format_report(usage_by_name: dict) -> str:
+    """Table of RSS/PSS per process (in MB) with a total row"""
+    lines = [f"{'process':<16}{'RSS MB':>10}{'PSS MB':>10}{'shared MB':>11}{'private MB':>12}"]
+    totals = {"Rss": 0, "Pss": 0}
+    for name, usage in usage_by_name.items():
+        shared = usage.get("Shared_Clean", 0) + usage.get("Shared_Dirty", 0)
+        private = usage.get("Private_Clean", 0) + usage.get("Private_Dirty", 0)
+        lines.append(
+            f"{name:<16}{usage.get('Rss', 0) / 1024:>10.1f}{usage.get('Pss', 0) / 1024:>10.1f}"
+            f"{shared / 1024:>11.1f}{private / 1024:>12.1f}"
+        )
+        totals["Rss"] += usage.get("Rss", 0)
+        totals["Pss"] += usage.get("Pss", 0)
+    lines.append(f"{'total':<16}{totals['Rss'] / 1024:>10.1f}{totals['Pss'] / 1024:>10.1f}")
+    return "\n".join(lines)
+
+
+def current_rss_kb(pid: int = None):
+    """
+    Resident memory of a process in kB, or None where it cannot be read.
+    Uses /proc on Linux and psutil (if installed) elsewhere.
+    """
+    pid = pid or os.getpid()
+    try:
+        return read_memory(pid).get("Rss")
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process(pid).memory_info().rss // 1024
+
+
+def peak_rss_kb():
+    """Peak resident memory of this process in kB, or None where unavailable"""
+    try:
+        import resource
+    except ImportError:
+        # Windows: psutil exposes the peak working set instead
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return getattr(psutil.Process().memory_info(), "peak_wset", 0) // 1024 or None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kB on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
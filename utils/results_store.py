@@ -0,0 +1,292 @@
+"""
+Append-only columnar store for scored results.
+
+Rows are written in immutable segments, one directory per segment with
+one .npy file per column. Queries memory-map only the columns they need
+and skip whole segments using each segment's meta.json (row count, date
+range and the rows belonging to each candidate), so cohort aggregates
+never load the full dataset.
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import date, datetime
+
+import numpy as np
+
+from utils.text_compare import edit_stats
+
+DEFAULT_ROOT = os.environ.get("GSE_RESULTS_STORE", "results_store")
+
+TEXT_COLUMNS = ["file_id", "candidate", "transcript", "corrected"]
+NUMERIC_COLUMNS = {
+    "score": np.float32,
+    "similarity": np.float32,
+    "words_original": np.int32,
+    "words_corrected": np.int32,
+    "words_inserted": np.int32,
+    "words_deleted": np.int32,
+    "words_replaced": np.int32,
+    "time_transcribe": np.float32,
+    "time_correct": np.float32,
+    "time_score": np.float32,
+    "time_total": np.float32,
+}
+DATE_COLUMN = "scored_at"
+COLUMNS = TEXT_COLUMNS + list(NUMERIC_COLUMNS) + [DATE_COLUMN]
+
+
+def _to_datetime64(value):
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    return np.datetime64(value, "s")
+
+
+def make_row(result: dict, candidate: str = None, scored_at=None) -> dict:
+    """Turn a pipeline result (see models/pipeline.py) into a store row"""
+    timings = result.get("timings", {})
+    transcript = result.get("transcript", "")
+    corrected = result.get("corrected", "")
+    row = {
+        "file_id": result.get("file", ""),
+        "candidate": candidate if candidate is not None else result.get("candidate", ""),
+        "transcript": transcript,
+        "corrected": corrected,
+        "score": result.get("score", 0),
+        "similarity": result.get("similarity", np.nan),
+        "time_transcribe": timings.get("transcribe", 0.0),
+        "time_correct": timings.get("correct", 0.0),
+        "time_score": timings.get("score", 0.0),
+        "time_total": sum(timings.values()),
+        DATE_COLUMN: scored_at or result.get("scored_at") or datetime.now(),
+    }
+    for name, value in edit_stats(transcript, corrected).items():
+        row[f"words_{name}"] = value
+    return row
+
+
+class ResultsStore:
+    def __init__(self, root: str = DEFAULT_ROOT, segment_rows: int = 4096):
+        self.root = root
+        self.segment_rows = segment_rows
+        self._buffer = []
+        os.makedirs(os.path.join(root, "segments"), exist_ok=True)
+
+    def append(self, row: dict):
+        """Buffer one row; a segment is written every `segment_rows` rows"""
+        self._buffer.append(row)
+        if len(self._buffer) >= self.segment_rows:
+            self.flush()
+
+    def append_result(self, result: dict, candidate: str = None):
+        if "error" not in result:
+            self.append(make_row(result, candidate))
+
+    def flush(self):
+        if self._buffer:
+            self._write_segment(self._buffer)
+            self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def _write_segment(self, rows: list, replaces: list = None):
+        columns = {name: np.array([str(r.get(name, "")) for r in rows]) for name in TEXT_COLUMNS}
+        for name, dtype in NUMERIC_COLUMNS.items():
+            columns[name] = np.array([r.get(name, 0) for r in rows], dtype=dtype)
+        columns[DATE_COLUMN] = np.array([_to_datetime64(r[DATE_COLUMN]) for r in rows])
+
+        candidates = {}
+        for i, candidate in enumerate(columns["candidate"].tolist()):
+            candidates.setdefault(candidate, []).append(i)
+
+        meta = {
+            "rows": len(rows),
+            "date_min": str(columns[DATE_COLUMN].min()),
+            "date_max": str(columns[DATE_COLUMN].max()),
+            "candidates": candidates,
+        }
+        if replaces:
+            meta["replaces"] = replaces
+
+        # Build in a temp dir and rename so readers never see half a segment;
+        # unique names let several writers append concurrently
+        name = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        segments_dir = os.path.join(self.root, "segments")
+        tmp_dir = os.path.join(segments_dir, f".tmp-{name}")
+        os.makedirs(tmp_dir)
+        for column, values in columns.items():
+            np.save(os.path.join(tmp_dir, f"{column}.npy"), values)
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.rename(tmp_dir, os.path.join(segments_dir, name))
+
+    def compact(self):
+        """
+        Merge segments smaller than `segment_rows` (e.g. from the UI's
+        one-row appends). Each merged segment lists the segments it
+        replaces in its meta.json and readers skip those, so the switch
+        happens in the one rename that publishes it and a crash never
+        leaves rows counted twice. Replaced segments are only deleted by
+        the next compaction, giving scans already running time to finish.
+        Run one compaction at a time.
+        """
+        self._remove_replaced()
+
+        groups = [[]]
+        group_rows = 0
+        for segment, meta in self._segments():
+            if meta["rows"] >= self.segment_rows:
+                continue
+            if group_rows + meta["rows"] > self.segment_rows:
+                groups.append([])
+                group_rows = 0
+            groups[-1].append(segment)
+            group_rows += meta["rows"]
+
+        for group in groups:
+            if len(group) < 2:
+                continue
+            rows = []
+            for segment in group:
+                columns = {c: self._load_column(segment, c) for c in COLUMNS}
+                for i in range(len(columns["file_id"])):
+                    rows.append({c: columns[c][i].item() for c in COLUMNS})
+            self._write_segment(rows, replaces=[os.path.basename(s) for s in group])
+
+    def _remove_replaced(self):
+        segments_dir = os.path.join(self.root, "segments")
+        for name in self._list_segments()[1]:
+            path = os.path.join(segments_dir, name)
+            if os.path.isdir(path):
+                try:
+                    # Hide it first so readers never see a half-deleted segment
+                    os.rename(path, os.path.join(segments_dir, f".del-{name}"))
+                except OSError:
+                    continue  # e.g. still memory-mapped on Windows; retried next time
+        for name in os.listdir(segments_dir):
+            if name.startswith(".del-"):
+                shutil.rmtree(os.path.join(segments_dir, name), ignore_errors=True)
+
+    def _list_segments(self):
+        """([(path, meta)] of live segments, names of replaced segments)"""
+        segments_dir = os.path.join(self.root, "segments")
+        found = []
+        for name in sorted(os.listdir(segments_dir)):
+            if name.startswith("."):
+                continue
+            path = os.path.join(segments_dir, name)
+            try:
+                with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                    found.append((name, path, json.load(f)))
+            except FileNotFoundError:
+                continue  # deleted by a compaction after listdir
+        replaced = {r for _, _, meta in found for r in meta.get("replaces", [])}
+        return [(path, meta) for name, path, meta in found if name not in replaced], replaced
+
+    def _segments(self) -> list:
+        return self._list_segments()[0]
+
+    @staticmethod
+    def _load_column(segment: str, column: str):
+        return np.load(os.path.join(segment, f"{column}.npy"), mmap_mode="r")
+
+    def scan(self, columns: list, candidate: str = None, start=None, end=None):
+        """
+        Yield one dict of column arrays per segment holding the matching rows.
+        `start` is inclusive and `end` exclusive; both accept dates,
+        datetimes or ISO strings.
+        """
+        start, end = _to_datetime64(start), _to_datetime64(end)
+        for segment, meta in self._segments():
+            if start is not None and np.datetime64(meta["date_max"]) < start:
+                continue
+            if end is not None and np.datetime64(meta["date_min"]) >= end:
+                continue
+
+            if candidate is not None:
+                if candidate not in meta["candidates"]:
+                    continue
+                rows = np.array(meta["candidates"][candidate])
+            else:
+                rows = np.arange(meta["rows"])
+
+            try:
+                if start is not None or end is not None:
+                    dates = self._load_column(segment, DATE_COLUMN)[rows]
+                    keep = np.ones(len(rows), dtype=bool)
+                    if start is not None:
+                        keep &= dates >= start
+                    if end is not None:
+                        keep &= dates < end
+                    rows = rows[keep]
+                if not len(rows):
+                    continue
+                chunk = {c: np.asarray(self._load_column(segment, c)[rows]) for c in columns}
+            except FileNotFoundError:
+                continue  # replaced and deleted by two compactions during this scan
+            yield chunk
+
+    def cohort_stats(self, candidate: str = None, start=None, end=None,
+                     percentiles=(50, 90, 95)) -> dict:
+        """Count, mean and percentiles of score (and total time) for a cohort"""
+        scores = []
+        times = []
+        for chunk in self.scan(["score", "time_total"], candidate, start, end):
+            scores.append(chunk["score"])
+            times.append(chunk["time_total"])
+        if not scores:
+            return {"count": 0}
+
+        scores = np.concatenate(scores)
+        times = np.concatenate(times)
+        stats = {
+            "count": int(len(scores)),
+            "mean_score": float(scores.mean()),
+            "mean_time": float(times.mean()),
+        }
+        for q, value in zip(percentiles, np.percentile(scores, percentiles)):
+            stats[f"p{q}_score"] = float(value)
+        return stats
+
+    def slowest(self, n: int = 10, candidate: str = None, start=None, end=None) -> list:
+        """The `n` files with the longest total pipeline time"""
+        if n <= 0:
+            return []
+        columns = ["file_id", "candidate", "score", "time_total", DATE_COLUMN]
+        best = None
+        for chunk in self.scan(columns, candidate, start, end):
+            if best is not None:
+                chunk = {c: np.concatenate([best[c], chunk[c]]) for c in columns}
+            if len(chunk["time_total"]) > n:
+                # Keep only the running top n, so memory stays O(n)
+                top = np.argpartition(chunk["time_total"], -n)[-n:]
+                chunk = {c: chunk[c][top] for c in columns}
+            best = chunk
+        if best is None:
+            return []
+
+        order = np.argsort(best["time_total"])[::-1]
+        return [
+            {
+                "file_id": str(best["file_id"][i]),
+                "candidate": str(best["candidate"][i]),
+                "score": float(best["score"][i]),
+                "time_total": float(best["time_total"][i]),
+                DATE_COLUMN: str(best[DATE_COLUMN][i]),
+            }
+            for i in order
+        ]
+
+    def candidates(self) -> list:
+        names = set()
+        for _, meta in self._segments():
+            names.update(meta["candidates"])
+        return sorted(names)
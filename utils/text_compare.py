@@ -1,4 +1,5 @@
 import difflib
+import re
 
 def compare(original: str, corrected: str) -> str:
     """
@@ -6,3 +7,38 @@ def compare(original: str, corrected: str) -> str:
     """
     diff = difflib.ndiff(original.split(), corrected.split())
     return "\n".join(diff)
+
+
+def edit_stats(original: str, corrected: str) -> dict:
+    """
+    Word-level edit counts needed to turn original into corrected text
+    """
+    a, b = original.split(), corrected.split()
+    stats = {"original": len(a), "corrected": len(b), "inserted": 0, "deleted": 0, "replaced": 0}
+    for op, i1, i2, j1, j2 in difflib.SequenceMatcher(a=a, b=b).get_opcodes():
+        if op == "insert":
+            stats["inserted"] += j2 - j1
+        elif op == "delete":
+            stats["deleted"] += i2 - i1
+        elif op == "replace":
+            stats["replaced"] += max(i2 - i1, j2 - j1)
+    return stats
+
+
+def _normalize_words(text: str) -> list:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> tuple:
+    """
+    (word edit distance, reference word count) after lowercasing and
+    stripping punctuation
+    """
+    ref, hyp = _normalize_words(reference), _normalize_words(hypothesis)
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1], len(ref)
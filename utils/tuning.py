@@ -0,0 +1,34 @@
+import json
+import os
+
+# Written by `python -m tools.tune`; override the location with GSE_TUNING_PROFILE
+PROFILE_PATH = os.environ.get("GSE_TUNING_PROFILE", "tuning_profile.json")
+
+_profile = None
+
+
+def load_profile() -> dict:
+    """
+    Load the tuned config profile for this machine.
+    Returns an empty dict when no profile has been written yet.
+    """
+    global _profile
+    if _profile is None:
+        try:
+            with open(PROFILE_PATH, encoding="utf-8") as f:
+                _profile = json.load(f)
+        except (OSError, ValueError):
+            _profile = {}
+    return _profile
+
+
+def save_profile(profile: dict, path: str = None):
+    global _profile
+    with open(path or PROFILE_PATH, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    if path is None or path == PROFILE_PATH:
+        _profile = profile
+
+
+def get_setting(section: str, key: str, default=None):
+    return load_profile().get(section, {}).get(key, default)
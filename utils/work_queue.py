@@ -0,0 +1,306 @@
+import json
+import sqlite3
+import time
+import xmlrpc.client
+from xmlrpc.server import SimpleXMLRPCServer
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class WorkQueue:
+    """
+    SQLite-backed queue of leased work units.
+
+    Workers claim a unit, renew its lease with heartbeat() while working
+    and finish it with complete() or fail(). A unit whose lease expires
+    (worker crashed or lost its node) becomes claimable again until it
+    runs out of attempts.
+
+    The database must only be opened by processes on one machine: WAL
+    mode does not work over NFS or SMB, and lease expiry compares
+    time.time() values from the processes that wrote them. Workers on
+    other nodes reach it through serve_queue() and RemoteQueue instead,
+    so every lease is timed by the queue host's clock.
+    """
+
+    def __init__(self, db_path: str, lease_seconds: float = 60.0, max_attempts: int = 3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._init_db()
+
+    def _connect(self):
+        # One short-lived connection per call keeps this safe to use from
+        # heartbeat threads and forked worker processes
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            # Single-host only; remote workers go through serve_queue()
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS units (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    ingested INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(units)")]
+            if "ingested" not in columns:
+                # Queue created before results were ingested into the store
+                conn.execute("ALTER TABLE units ADD COLUMN ingested INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS units_status ON units (status)")
+        finally:
+            conn.close()
+
+    def add_units(self, payloads) -> int:
+        """Add one unit per payload (any JSON-serialisable value)"""
+        rows = [(json.dumps(p),) for p in payloads]
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT INTO units (payload) VALUES (?)", rows)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return len(rows)
+
+    def claim(self, worker_id: str):
+        """
+        Lease the next available unit to worker_id.
+        Returns (unit_id, payload) or None when nothing is claimable.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._expire_leases(conn, now)
+            row = conn.execute(
+                "SELECT id, payload FROM units WHERE status = ? ORDER BY id LIMIT 1",
+                (PENDING,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE units SET status = ?, worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (LEASED, worker_id, now + self.lease_seconds, row[0])
+            )
+            conn.execute("COMMIT")
+            return row[0], json.loads(row[1])
+        finally:
+            conn.close()
+
+    def _expire_leases(self, conn, now):
+        # Lost leases go back to pending, or to failed once out of attempts
+        conn.execute(
+            "UPDATE units SET status = ?, error = 'lease expired' "
+            "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, LEASED, now, self.max_attempts)
+        )
+        conn.execute(
+            "UPDATE units SET status = ?, worker = NULL, lease_expires = NULL "
+            "WHERE status = ? AND lease_expires < ?",
+            (PENDING, LEASED, now)
+        )
+
+    def heartbeat(self, unit_id: int, worker_id: str) -> bool:
+        """
+        Extend the lease on unit_id.
+        Returns False if the worker no longer holds the lease.
+        """
+        return self._update_leased(
+            unit_id, worker_id,
+            "lease_expires = ?", (time.time() + self.lease_seconds,)
+        )
+
+    def complete(self, unit_id: int, worker_id: str, result) -> bool:
+        """Mark unit_id done and store its result"""
+        return self._update_leased(
+            unit_id, worker_id,
+            "status = ?, result = ?, lease_expires = NULL", (DONE, json.dumps(result))
+        )
+
+    def fail(self, unit_id: int, worker_id: str, error: str) -> bool:
+        """Release unit_id after an error so it can be retried"""
+        conn = self._connect()
+        try:
+            cur = conn.execute(
+                "UPDATE units SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "worker = NULL, lease_expires = NULL, error = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (self.max_attempts, FAILED, PENDING, error, unit_id, worker_id, LEASED)
+            )
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def _update_leased(self, unit_id, worker_id, assignments, params) -> bool:
+        conn = self._connect()
+        try:
+            cur = conn.execute(
+                f"UPDATE units SET {assignments} "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (*params, unit_id, worker_id, LEASED)
+            )
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def counts(self) -> dict:
+        """Number of units in each status"""
+        conn = self._connect()
+        try:
+            self._expire_leases(conn, time.time())
+            rows = conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def results(self):
+        """Yield the stored result of every completed unit"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT result FROM units WHERE status = ? ORDER BY id", (DONE,)
+            ).fetchall()
+        finally:
+            conn.close()
+        for (result,) in rows:
+            yield json.loads(result)
+
+    def results_to_ingest(self):
+        """Yield (unit_id, result) for completed units not yet marked ingested"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, result FROM units WHERE status = ? AND ingested = 0 ORDER BY id",
+                (DONE,)
+            ).fetchall()
+        finally:
+            conn.close()
+        for unit_id, result in rows:
+            yield unit_id, json.loads(result)
+
+    def mark_ingested(self, unit_ids):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("UPDATE units SET ingested = 1 WHERE id = ?", [(i,) for i in unit_ids])
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def is_finished(self) -> bool:
+        counts = self.counts()
+        return counts[PENDING] == 0 and counts[LEASED] == 0
+
+
+class _QueueService:
+    """The WorkQueue methods workers need, with payloads and results sent as JSON"""
+
+    def __init__(self, queue: WorkQueue):
+        self.queue = queue
+
+    def settings(self) -> dict:
+        return {"lease_seconds": self.queue.lease_seconds, "max_attempts": self.queue.max_attempts}
+
+    def claim(self, worker_id: str):
+        claimed = self.queue.claim(worker_id)
+        if claimed is None:
+            return None
+        unit_id, payload = claimed
+        return unit_id, json.dumps(payload)
+
+    def heartbeat(self, unit_id: int, worker_id: str) -> bool:
+        return self.queue.heartbeat(unit_id, worker_id)
+
+    def complete(self, unit_id: int, worker_id: str, result: str) -> bool:
+        return self.queue.complete(unit_id, worker_id, json.loads(result))
+
+    def fail(self, unit_id: int, worker_id: str, error: str) -> bool:
+        return self.queue.fail(unit_id, worker_id, error)
+
+    def counts(self) -> dict:
+        return self.queue.counts()
+
+    def is_finished(self) -> bool:
+        return self.queue.is_finished()
+
+
+def make_queue_server(queue: WorkQueue, host: str = "0.0.0.0", port: int = 8765):
+    """XML-RPC server exposing `queue` to RemoteQueue clients"""
+    server = SimpleXMLRPCServer((host, port), allow_none=True, logRequests=False)
+    server.register_instance(_QueueService(queue))
+    return server
+
+
+def serve_queue(queue: WorkQueue, host: str = "0.0.0.0", port: int = 8765):
+    """Serve `queue` to workers on other nodes until interrupted"""
+    with make_queue_server(queue, host, port) as server:
+        server.serve_forever()
+
+
+class RemoteQueue:
+    """
+    Worker-side client for a queue served by serve_queue(). Supports the
+    calls run_worker makes: claim, heartbeat, complete, fail, counts and
+    is_finished.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        settings = self._proxy().settings()
+        self.lease_seconds = settings["lease_seconds"]
+        self.max_attempts = settings["max_attempts"]
+
+    def _proxy(self):
+        # One proxy per call, as ServerProxy is not safe to share with the
+        # heartbeat thread
+        return xmlrpc.client.ServerProxy(self.url, allow_none=True)
+
+    def claim(self, worker_id: str):
+        claimed = self._proxy().claim(worker_id)
+        if claimed is None:
+            return None
+        unit_id, payload = claimed
+        return unit_id, json.loads(payload)
+
+    def heartbeat(self, unit_id: int, worker_id: str) -> bool:
+        return self._proxy().heartbeat(unit_id, worker_id)
+
+    def complete(self, unit_id: int, worker_id: str, result) -> bool:
+        return self._proxy().complete(unit_id, worker_id, json.dumps(result))
+
+    def fail(self, unit_id: int, worker_id: str, error: str) -> bool:
+        return self._proxy().fail(unit_id, worker_id, error)
+
+    def counts(self) -> dict:
+        return self._proxy().counts()
+
+    def is_finished(self) -> bool:
+        return self._proxy().is_finished()
+
+
+def open_queue(location: str, lease_seconds: float = 60.0, max_attempts: int = 3):
+    """A RemoteQueue for an http(s):// URL, else a WorkQueue on that database path"""
+    if location.startswith(("http://", "https://")):
+        return RemoteQueue(location)
+    return WorkQueue(location, lease_seconds, max_attempts)